@@ -0,0 +1,152 @@
+"""Headless batch scoring of completed questionnaires.
+
+    python batch_score.py answers.csv predictions.csv [--chunk-size 100000]
+
+The input (CSV or Parquet) needs one column per selected model feature,
+holding the same answers the form would submit. It is streamed in chunks,
+encoded exactly like the submit path and written out with the predicted
+career and one probability column per career; --top-k N writes the N most
+likely careers and their probabilities instead, and --explain N the N
+features that moved each prediction most. Parquet needs pyarrow.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import model_store
+from inference import Predictor
+
+CHUNK_SIZE = 100_000
+
+# -----------------------------
+# Chunked readers / writers
+# -----------------------------
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet input/output needs pyarrow: pip install pyarrow")
+    return pq
+
+def iter_chunks(path, columns=None, chunk_size=CHUNK_SIZE):
+    if _is_parquet(path):
+        pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._csv = None
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            pq = _require_pyarrow()
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            if self._csv is None:
+                self._csv = open(self.path, "w", newline="")
+                df.to_csv(self._csv, index=False, float_format="%.6g")
+            else:
+                df.to_csv(self._csv, index=False, header=False, float_format="%.6g")
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._csv is not None:
+            self._csv.close()
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def score_chunk(predictor, chunk, id_column=None, with_proba=True, top_k=None, explain=None):
+    X, unseen = predictor.encode_frame(chunk)
+    proba, leaves = predictor.score(X)
+    out = {}
+    if id_column:
+        out[id_column] = chunk[id_column].to_numpy()
+    out["Predicted_Career"] = predictor.class_labels[proba.argmax(axis=1)]
+    if top_k:
+        ranked, ranked_proba = predictor.top_k(proba, top_k)
+        for j in range(ranked.shape[1]):
+            out[f"top{j + 1}_career"] = ranked[:, j]
+            out[f"top{j + 1}_proba"] = ranked_proba[:, j].astype(np.float32)
+    elif with_proba:
+        for j, career in enumerate(predictor.class_labels):
+            out[f"proba_{career}"] = proba[:, j].astype(np.float32)
+    if explain:
+        features, contributions = predictor.reasons(leaves, explain)
+        for j in range(features.shape[1]):
+            out[f"reason{j + 1}_feature"] = features[:, j]
+            out[f"reason{j + 1}_contribution"] = contributions[:, j]
+    return pd.DataFrame(out), unseen
+
+def score_file(input_path, output_path, predictor, chunk_size=CHUNK_SIZE, id_column=None, with_proba=True,
+               top_k=None, explain=None):
+    columns = list(predictor.features) + ([id_column] if id_column else [])
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+    unseen_total = {}
+    try:
+        for chunk in iter_chunks(input_path, columns=columns, chunk_size=chunk_size):
+            scored, unseen = score_chunk(predictor, chunk, id_column, with_proba, top_k, explain)
+            writer.write(scored)
+            n_rows += len(chunk)
+            for col, count in unseen.items():
+                unseen_total[col] = unseen_total.get(col, 0) + count
+    finally:
+        writer.close()
+    return n_rows, unseen_total
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet of questionnaire answers.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--n-features", type=int, default=model_store.N_FEATURES)
+    parser.add_argument("--backend", choices=model_store.MODEL_BACKENDS, default=model_store.BACKEND)
+    parser.add_argument("--id-column", help="input column copied to the output to identify rows")
+    parser.add_argument("--unseen", choices=["default", "error"], default="default",
+                        help="score unseen answers as missing (the schema's missing code), or stop with an error")
+    parser.add_argument("--no-proba", action="store_true", help="only write the predicted career")
+    parser.add_argument("--top-k", type=int, help="write the K most likely careers instead of every probability")
+    parser.add_argument("--explain", type=int, metavar="N", help="write the N features that moved each prediction most")
+    args = parser.parse_args(argv)
+
+    bundle = model_store.get_bundle(n_features=args.n_features, backend=args.backend)
+    predictor = Predictor(bundle, unseen=args.unseen)
+    if args.explain and predictor.tree is None:
+        parser.error(f"--explain needs the decision_tree backend, not {args.backend}")
+
+    start = time.perf_counter()
+    n_rows, unseen = score_file(
+        args.input, args.output, predictor,
+        chunk_size=args.chunk_size, id_column=args.id_column, with_proba=not args.no_proba,
+        top_k=args.top_k, explain=args.explain,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {n_rows:,} rows in {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.output}")
+    for col, count in unseen.items():
+        print(f"  {count:,} unseen values for {col} scored as missing")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,195 @@
+"""Headless benchmarks for the load -> encode -> train -> predict pipeline.
+
+    python bench.py [--repeats 20] [--warmup 3] [--stage predict_row ...] [--rows 100000]
+                    [--output bench.json] [--baseline old.json] [--threshold 0.25]
+
+Times every stage outside Streamlit: each stage is warmed up, then run
+--repeats times (fast stages are looped inside a repeat until it lasts at
+least --min-time, like timeit) and summarized as per-call percentiles.
+Results are JSON with the git commit and library versions, so runs from
+different commits can be compared. With --baseline the run fails (exit 1)
+when any stage's median is more than --threshold slower than in the
+baseline file. --rows N runs preprocess/train/predict_batch on N synthetic
+rows (synth.py) instead of the real data, for scaling runs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import model_store
+from inference import PredictionCache, Predictor
+from synth import synthesize
+from pipeline import (
+    DATA_PATH, SNAPSHOT_PATH, FEATURES_PATH, TARGET,
+    load_dataset, load_snapshot, preprocess_data, train_model,
+)
+
+PERCENTILES = (50, 90, 99)
+
+# -----------------------------
+# Timing
+# -----------------------------
+def _calibrate(fn, min_time):
+    # Calls per repeat so one repeat lasts at least min_time (1, 2, 5, 10, 20, ...)
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            n = number * factor
+            start = time.perf_counter()
+            for _ in range(n):
+                fn()
+            if time.perf_counter() - start >= min_time:
+                return n
+        number *= 10
+
+def time_stage(fn, repeats=20, warmup=3, min_time=0.02):
+    for _ in range(warmup):
+        fn()
+    number = _calibrate(fn, min_time)
+    per_call = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+
+    samples = np.array(per_call) * 1000
+    result = {
+        "repeats": repeats,
+        "number": number,
+        "min_ms": float(samples.min()),
+        "mean_ms": float(samples.mean()),
+        "stdev_ms": float(statistics.stdev(samples)) if repeats > 1 else 0.0,
+    }
+    for q in PERCENTILES:
+        result[f"p{q}_ms"] = float(np.percentile(samples, q))
+    return result
+
+# -----------------------------
+# Stages
+# -----------------------------
+def build_stages(data_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH, features_path=FEATURES_PATH,
+                 n_features=model_store.N_FEATURES, backend=model_store.BACKEND, batch_rows=1000, rows=None):
+    # name -> zero-argument callable; inputs are prepared once, outside the timings
+    df = load_snapshot(snapshot_path, features_path) if os.path.exists(snapshot_path) else load_dataset(data_path)
+    if rows:
+        df = synthesize(rows, df=df)
+        batch_rows = rows
+    df_processed, schema = preprocess_data(df)
+    X = df_processed[schema.names]
+    y = df_processed[TARGET]
+
+    bundle = model_store.get_bundle(data_path, n_features, snapshot_path=snapshot_path, backend=backend)
+    # Cache disabled so every call scores; predict_cached measures the hit path separately
+    predictor = Predictor(bundle, cache=PredictionCache(max_size=0))
+    cached = Predictor(bundle, cache=PredictionCache())
+    answers = df.iloc[0][predictor.features].to_dict()
+    frame = df[predictor.features].sample(batch_rows, replace=True, random_state=0).reset_index(drop=True)
+
+    stages = {
+        "load_columnar": lambda: load_dataset(data_path),
+        "load_snapshot": lambda: load_snapshot(snapshot_path, features_path),
+        "preprocess": lambda: preprocess_data(df, schema),
+        "train": lambda: train_model(X, y, n_features=n_features, backend=backend),
+        "encode_row": lambda: predictor.encode(answers),
+        "predict_row": lambda: predictor.predict(answers),
+        "predict_cached": lambda: cached.predict(answers),
+        "predict_top_k": lambda: predictor.predict_top_k(answers),
+        "predict_batch": lambda: predictor.predict_frame(frame),
+    }
+    if not os.path.exists(data_path):
+        del stages["load_columnar"]
+    if not os.path.exists(snapshot_path):
+        del stages["load_snapshot"]
+    return stages
+
+# -----------------------------
+# Reporting and comparison
+# -----------------------------
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+def compare(results, baseline, threshold=0.25, metric="p50_ms"):
+    # Stages present in both runs whose metric grew by more than threshold
+    regressions = []
+    for name, stage in results["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None or before[metric] <= 0:
+            continue
+        ratio = stage[metric] / before[metric]
+        if ratio > 1 + threshold:
+            regressions.append({"stage": name, "baseline_ms": before[metric], "current_ms": stage[metric],
+                                "ratio": ratio})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the career prediction pipeline.")
+    parser.add_argument("--stage", action="append", help="stage to run (repeatable; default all)")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.02, help="seconds per repeat for fast stages")
+    parser.add_argument("--n-features", type=int, default=model_store.N_FEATURES)
+    parser.add_argument("--backend", choices=model_store.MODEL_BACKENDS, default=model_store.BACKEND)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    parser.add_argument("--features", default=FEATURES_PATH)
+    parser.add_argument("--rows", type=int, help="benchmark on this many synthetic rows")
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed median slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    stages = build_stages(args.data, args.snapshot, args.features, args.n_features, args.backend,
+                          rows=args.rows)
+    names = args.stage or list(stages)
+    unknown = [name for name in names if name not in stages]
+    if unknown:
+        parser.error(f"unknown stage(s) {unknown}, expected some of {list(stages)}")
+
+    results = {"environment": environment(), "backend": args.backend, "rows": args.rows, "stages": {}}
+    for name in names:
+        results["stages"][name] = stats = time_stage(stages[name], args.repeats, args.warmup, args.min_time)
+        print(f"{name:16s} p50 {stats['p50_ms']:10.4f} ms  p90 {stats['p90_ms']:10.4f} ms  "
+              f"p99 {stats['p99_ms']:10.4f} ms  ({stats['number']} calls x {stats['repeats']})", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            results["regressions"] = compare(results, json.load(fh), args.threshold)
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    else:
+        print(report)
+
+    for r in results.get("regressions", []):
+        print(f"REGRESSION: {r['stage']} {r['baseline_ms']:.4f} ms -> {r['current_ms']:.4f} ms "
+              f"({r['ratio']:.2f}x)", file=sys.stderr)
+    return 1 if results.get("regressions") else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,248 @@
+import numpy as np
+
+# -----------------------------
+# Array-backed decision tree
+# -----------------------------
+class CompiledTree:
+    # A fitted DecisionTreeClassifier flattened into plain node arrays. Scoring needs only
+    # NumPy: every row moves one level down per step, so a batch costs max_depth vectorized
+    # gathers no matter how many rows it has. Leaves point to themselves and compare
+    # against +inf, so rows that reach a leaf early just stay there.
+    def __init__(self, feature, threshold, left, right, proba, max_depth, n_samples=None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.proba = np.asarray(proba, dtype=np.float64)
+        self.max_depth = int(max_depth)
+        # Training rows that reached each node; the evidence behind its class frequencies
+        self.n_samples = (np.ones(len(self.left)) if n_samples is None
+                          else np.asarray(n_samples, dtype=np.float64))
+        self.n_features = int(self.feature.max()) + 1 if len(self.feature) else 0
+        self.is_leaf = self.left == np.arange(len(self.left))
+        # children[2 * node + went_right] -> next node: one gather per level instead of two
+        self.children = np.stack([self.left, self.right], axis=1).ravel()
+        internal = np.flatnonzero(~self.is_leaf)
+        self.parent = np.full(len(self.left), -1, dtype=np.intp)
+        self.parent[self.left[internal]] = internal
+        self.parent[self.right[internal]] = internal
+        # Plain lists make walking a single row cheaper than any NumPy call
+        self._row_tables = (
+            self.feature.tolist(), self.threshold.tolist(), self.left.tolist(), self.right.tolist(),
+        )
+
+    @classmethod
+    def from_estimator(cls, clf):
+        # Reads the sklearn tree_ arrays; sklearn itself is not imported here
+        tree = clf.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        values = tree.value[:, 0, :]
+        return cls(
+            feature=np.where(leaf, 0, tree.feature),
+            threshold=np.where(leaf, np.inf, tree.threshold),
+            left=np.where(leaf, nodes, tree.children_left),
+            right=np.where(leaf, nodes, tree.children_right),
+            proba=values / values.sum(axis=1, keepdims=True),
+            max_depth=tree.max_depth,
+            n_samples=tree.weighted_n_node_samples,
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**arrays)
+
+    def to_arrays(self):
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "proba": self.proba,
+            "max_depth": self.max_depth,
+            "n_samples": self.n_samples,
+        }
+
+    def apply(self, X):
+        # Same float32 cast and "<= threshold goes left" rule as sklearn's tree_.apply
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_cols = X.shape
+        flat = X.ravel()
+        offsets = np.arange(n_rows, dtype=np.intp) * n_cols
+        node = np.zeros(n_rows, dtype=np.intp)
+        for _ in range(self.max_depth):
+            go_right = flat[offsets + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+        return node
+
+    def apply_row(self, row):
+        # Python floats keep the comparison in double precision, as in apply(); the same
+        # "not > threshold goes left" test sends a NaN the same way as the batch walk
+        values = row.tolist() if isinstance(row, np.ndarray) else row
+        feature, threshold, left, right = self._row_tables
+        node = 0
+        while left[node] != node:
+            node = right[node] if values[feature[node]] > threshold[node] else left[node]
+        return node
+
+    def path_row(self, row):
+        # Nodes visited by one row, root to leaf
+        values = row.tolist() if isinstance(row, np.ndarray) else row
+        feature, threshold, left, right = self._row_tables
+        node = 0
+        path = [node]
+        while left[node] != node:
+            node = right[node] if values[feature[node]] > threshold[node] else left[node]
+            path.append(node)
+        return path
+
+    def node_contributions(self, proba):
+        # Change in every class probability from a node's parent to the node: the part of
+        # a prediction credited to the split above it. The root row is zero.
+        contributions = (proba - proba[np.maximum(self.parent, 0)]).astype(np.float32)
+        contributions[0] = 0
+        return contributions
+
+    def leaf_contributions(self, proba):
+        # Per-feature sum of node_contributions toward the leaf's own majority class along
+        # each root to leaf path (the Saabas decomposition): the root value plus a leaf's
+        # row adds up to that leaf's probability. Row i is filled for leaves only.
+        steps = self.node_contributions(proba)
+        contributions = np.zeros((len(self.left), self.n_features), dtype=np.float32)
+        for leaf in np.flatnonzero(self.is_leaf):
+            c = proba[leaf].argmax()
+            node = leaf
+            while self.parent[node] >= 0:
+                up = self.parent[node]
+                contributions[leaf, self.feature[up]] += steps[node, c]
+                node = up
+        return contributions
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+# -----------------------------
+# Array-backed tree ensembles
+# -----------------------------
+class CompiledForest:
+    # All trees of a RandomForest / ExtraTrees / HistGradientBoosting model in one node
+    # table (same leaf conventions as CompiledTree). A batch walks every tree at once:
+    # a (rows, trees) node matrix moves one level per step. combine is "mean" for forests
+    # (value rows are class distributions to average) or "softmax" for boosting (value is
+    # one raw score per node, trees stored iteration-major with one tree per class, plus
+    # the baseline raw score).
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, combine, baseline=None):
+        if combine not in ("mean", "softmax"):
+            raise ValueError("combine must be 'mean' or 'softmax'")
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.combine = combine
+        self.baseline = None if baseline is None else np.asarray(baseline, dtype=np.float64)
+        self.children = np.stack([self.left, self.right], axis=1).ravel()
+        # Rows per block so a (rows, trees) node matrix stays around a million entries
+        self.block_rows = max(1, (1 << 20) // len(self.roots))
+
+    @classmethod
+    def _concat(cls, trees, **kwargs):
+        # trees: (feature, threshold, left, right, is_leaf, value, depth) per tree, node ids local
+        parts = {name: [] for name in ("feature", "threshold", "left", "right", "value")}
+        roots, offset, max_depth = [], 0, 0
+        for feature, threshold, left, right, is_leaf, value, depth in trees:
+            nodes = np.arange(len(feature))
+            parts["feature"].append(np.where(is_leaf, 0, feature))
+            parts["threshold"].append(np.where(is_leaf, np.inf, threshold))
+            parts["left"].append(np.where(is_leaf, nodes, left) + offset)
+            parts["right"].append(np.where(is_leaf, nodes, right) + offset)
+            parts["value"].append(value)
+            roots.append(offset)
+            offset += len(feature)
+            max_depth = max(max_depth, int(depth))
+        return cls(**{name: np.concatenate(arrays) for name, arrays in parts.items()},
+                   roots=roots, max_depth=max_depth, **kwargs)
+
+    @classmethod
+    def from_forest(cls, clf):
+        # RandomForestClassifier / ExtraTreesClassifier: predict_proba averages the
+        # normalized leaf distributions of the trees
+        trees = []
+        for est in clf.estimators_:
+            tree = est.tree_
+            values = tree.value[:, 0, :]
+            trees.append((tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                          tree.children_left < 0, values / values.sum(axis=1, keepdims=True), tree.max_depth))
+        return cls._concat(trees, combine="mean")
+
+    @classmethod
+    def from_boosting(cls, clf):
+        # HistGradientBoostingClassifier without categorical features; reads its private
+        # per-iteration predictor node arrays
+        trees = []
+        for per_class in clf._predictors:
+            for predictor in per_class:
+                nodes = predictor.nodes
+                if nodes["is_categorical"].any():
+                    raise ValueError("Categorical splits are not supported by CompiledForest")
+                # Thresholds are float64 data values while rows arrive as float32; rounding them
+                # the same way keeps "value <= threshold" true for a value equal to one
+                threshold = nodes["num_threshold"].astype(np.float32)
+                trees.append((nodes["feature_idx"], threshold, nodes["left"], nodes["right"],
+                              nodes["is_leaf"].astype(bool), nodes["value"], nodes["depth"].max()))
+        return cls._concat(trees, combine="softmax", baseline=np.ravel(clf._baseline_prediction))
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(**arrays)
+
+    def to_arrays(self):
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": self.max_depth,
+            "combine": self.combine,
+            "baseline": self.baseline,
+        }
+
+    def apply(self, X):
+        # (n_rows, n_trees) leaf ids
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_cols = X.shape
+        flat = X.ravel()
+        offsets = (np.arange(n_rows, dtype=np.intp) * n_cols)[:, None]
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            go_right = flat[offsets + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+        return node
+
+    def _combine(self, leaves):
+        if self.combine == "mean":
+            proba = np.zeros((len(leaves), self.value.shape[1]))
+            for t in range(leaves.shape[1]):
+                proba += self.value[leaves[:, t]]
+            return proba / leaves.shape[1]
+        n_classes = len(self.baseline)
+        raw = self.value[leaves].reshape(len(leaves), -1, n_classes).sum(axis=1) + self.baseline
+        if n_classes == 1:
+            positive = 1 / (1 + np.exp(-raw[:, 0]))
+            return np.stack([1 - positive, positive], axis=1)
+        raw -= raw.max(axis=1, keepdims=True)
+        proba = np.exp(raw)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if len(X) <= self.block_rows:
+            return self._combine(self.apply(X))
+        return np.concatenate([
+            self._combine(self.apply(X[start:start + self.block_rows]))
+            for start in range(0, len(X), self.block_rows)
+        ])
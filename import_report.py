@@ -0,0 +1,94 @@
+"""Cold-start import cost of the serving path.
+
+    python import_report.py [--top 15] [--json] [--forbid sklearn] [module ...]
+
+Imports the given modules (by default every module app.py imports at the top,
+read from its source so the list follows the app) in a fresh interpreter with `-X importtime` and
+reports the total, the slowest top-level packages and whether any forbidden
+package was pulled in. --forbid makes the command fail when that happens,
+so CI can keep scikit-learn off the serving path.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+def app_imports(path=APP_PATH):
+    # Modules imported at the top of app.py, in order: what a cold start loads before serving
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+def measure_imports(modules):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": depth,
+        })
+    return timings
+
+def summarize(timings, top=15, forbid=()):
+    top_level = [t for t in timings if t["depth"] == 0]
+    imported = {t["module"] for t in timings}
+    return {
+        "total_ms": round(sum(t["self_ms"] for t in timings), 1),
+        "modules_imported": len(timings),
+        "slowest": sorted(top_level, key=lambda t: t["cumulative_ms"], reverse=True)[:top],
+        "forbidden_imported": sorted(
+            name for name in forbid if any(m == name or m.startswith(name + ".") for m in imported)
+        ),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import-time cost of the serving path.")
+    parser.add_argument("modules", nargs="*", help="modules to import (default: app.py's imports)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    parser.add_argument("--forbid", action="append", default=[],
+                        help="package that must not be imported (repeatable)")
+    args = parser.parse_args(argv)
+    args.modules = args.modules or app_imports()
+
+    report = summarize(measure_imports(args.modules), args.top, args.forbid)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Importing {', '.join(args.modules)}: {report['total_ms']:.0f} ms "
+              f"across {report['modules_imported']} modules")
+        for t in report["slowest"]:
+            print(f"  {t['cumulative_ms']:8.1f} ms  {t['module']}")
+        for name in report["forbidden_imported"]:
+            print(f"FORBIDDEN: {name} was imported")
+    return 1 if report["forbidden_imported"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,388 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from compiled_tree import CompiledForest, CompiledTree
+from schema import ORDINAL_LEVELS, Schema
+
+# Prediction cache limits (0 entries disables it)
+PREDICTION_CACHE_SIZE = int(os.environ.get("CAREER_PREDICTION_CACHE_SIZE", 10_000))
+PREDICTION_CACHE_TTL = float(os.environ.get("CAREER_PREDICTION_CACHE_TTL", 3600))
+
+# Pseudo-count spread evenly over the careers when turning model frequencies into
+# probabilities; builds replace it with the one fitted on their held-out split (fit_smoothing)
+PROBA_SMOOTHING = 1.0
+# Pseudo-counts tried by fit_smoothing
+SMOOTHING_GRID = np.logspace(-2, 6, 81)
+
+# Careers returned by the ranked prediction helpers
+TOP_K = 3
+
+# Codes of the Low/Medium/High answers a trait item can add
+LEVEL_CODES = tuple(range(len(ORDINAL_LEVELS)))
+
+# -----------------------------
+# Probability helpers
+# -----------------------------
+def smooth_proba(proba, n_samples, alpha=PROBA_SMOOTHING):
+    # Laplace estimate (count + alpha / K) / (n + alpha): a leaf that saw 2 training rows
+    # no longer claims 100%. It is monotone in the counts, so the ranking within a node
+    # (and the predicted career) stays exactly that of the raw frequencies. Ensembles have
+    # no per-row counts and pass n_samples=1: a fixed blend toward the uniform distribution.
+    n = np.reshape(n_samples, (-1, 1))
+    return (proba * n + alpha / proba.shape[1]) / (n + alpha)
+
+def fit_smoothing(proba, n_samples, y_index, grid=SMOOTHING_GRID):
+    # Calibration: the pseudo-count whose smoothed probabilities give held-out rows the
+    # lowest log loss. y_index[i] is the column of row i's true career, -1 for careers the
+    # model never saw (left out). Only the true-class probability enters the loss.
+    known = y_index >= 0
+    n = np.broadcast_to(n_samples, y_index.shape)[known]
+    true = proba[known][np.arange(known.sum()), y_index[known]]
+    k = proba.shape[1]
+    losses = [-np.log((true * n + alpha / k) / (n + alpha)).mean() for alpha in grid]
+    return float(grid[int(np.argmin(losses))])
+
+def top_k(proba, class_labels, k=TOP_K):
+    # Ranked (labels, probabilities), both (n_rows, k), from one probability matrix:
+    # argpartition picks the k best columns, only those k get sorted, and the labels are
+    # decoded with a single fancy-index into class_labels
+    proba = np.atleast_2d(proba)
+    k = max(1, min(k, proba.shape[1]))
+    idx = np.argpartition(-proba, k - 1, axis=1)[:, :k]
+    best = np.take_along_axis(proba, idx, axis=1)
+    order = np.lexsort((idx, -best), axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    return class_labels[idx], np.take_along_axis(proba, idx, axis=1)
+
+def _parse_number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+# -----------------------------
+# Prediction result cache
+# -----------------------------
+class PredictionCache:
+    # LRU with a per-entry TTL. Keys are (model version, encoded row bytes), so identical
+    # answer sets from any session share one entry and a new model never sees old results.
+    def __init__(self, max_size=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+
+# Shared by every Predictor (and so every session) in the process
+prediction_cache = PredictionCache()
+
+# -----------------------------
+# Precompiled predictor
+# -----------------------------
+def model_version(bundle):
+    # Prediction cache namespace of a bundle: backend, selection and a hash of everything
+    # that decides a result (feature order, careers, smoothing, compiled node arrays), so
+    # two builds share cache entries only when they would score every row identically
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr((bundle["selected_features"], bundle["class_labels"], bundle["smoothing"])).encode())
+    arrays = bundle["compiled_tree"] if bundle["compiled_tree"] is not None else bundle["compiled_forest"]
+    for name in sorted(arrays):
+        value = arrays[name]
+        digest.update(name.encode())
+        if isinstance(value, np.ndarray):
+            digest.update(str(value.dtype).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+    return f"{bundle['backend']}-{bundle['selection']}-{digest.hexdigest()}"
+
+class Predictor:
+    # Built once per model bundle: answers are encoded with plain dict lookups into a
+    # preallocated float32 row, and a prediction is one walk down the compiled tree (or,
+    # for ensemble backends, one vectorized walk down all compiled trees).
+    def __init__(self, bundle, unseen="default", cache=None):
+        if unseen not in ("default", "error"):
+            raise ValueError("unseen must be 'default' or 'error'")
+        self.unseen = unseen
+        self.version = model_version(bundle)
+        self.cache = prediction_cache if cache is None else cache
+        self.features = list(bundle["selected_features"])
+        self.feature_index = {col: i for i, col in enumerate(self.features)}
+        self.feature_names = np.asarray(self.features, dtype=object)
+
+        # Code tables straight from the schema training encoded with; categories[code] is
+        # the answer a code stands for
+        self.schema = Schema.from_dict(bundle["schema"])
+        self.categories = {
+            col: list(self.schema[col].categories) for col in self.features if self.schema[col].kind != "numeric"
+        }
+        self.code_tables = {col: self.schema[col].codes for col in self.categories}
+        # Written for missing and unseen answers; the same code training used for them
+        self.missing_code = self.schema.missing_code
+        self._encoders = [(i, col, self.code_tables.get(col)) for i, col in enumerate(self.features)]
+        self.class_labels = np.asarray(bundle["class_labels"], dtype=object)
+        self.backend = bundle["backend"]
+        # Pseudo-count fitted on the held-out split; every backend's probabilities go through it
+        self.smoothing = bundle["smoothing"]
+        if bundle["compiled_forest"] is not None:
+            # Ensembles score through their compiled trees; path explanations are
+            # decision-tree only, so those tables stay empty
+            self.tree = None
+            self.forest = CompiledForest.from_arrays(bundle["compiled_forest"])
+            self.node_contributions = self.leaf_contributions = None
+            self._local = threading.local()
+            return
+        self.forest = None
+        # Array-backed copy of the tree compiled at build time; no sklearn objects needed
+        self.tree = CompiledTree.from_arrays(bundle["compiled_tree"])
+        # Smoothed class distribution and majority class of every node, so a leaf id maps
+        # straight to probabilities and a career
+        self.node_proba = smooth_proba(self.tree.proba, self.tree.n_samples, self.smoothing)
+        self.node_class = self.node_proba.argmax(axis=1)
+        self.node_labels = self.class_labels[self.node_class]
+        # Per-node and per-leaf contributions precomputed at build time (model_store.build_importances)
+        self.node_contributions = bundle["importances"]["node_contributions"]
+        self.leaf_contributions = bundle["importances"]["leaf_contributions"]
+        self._local = threading.local()
+
+    def _row(self):
+        # One row buffer per thread; Streamlit serves sessions from several threads
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, len(self.features)), dtype=np.float32)
+        return row
+
+    def encode(self, user_input, out=None):
+        row = self._row()[0] if out is None else out
+        unseen = []
+        for i, col, table in self._encoders:
+            value = user_input[col]
+            if isinstance(value, str):
+                code = table.get(value) if table is not None else _parse_number(value)
+            else:
+                code = value
+            # Missing answers (None, NaN), unknown categories and text in numeric columns all
+            # follow the unseen policy; a NaN must never reach the tree walks
+            if code is None or code != code:
+                if self.unseen == "error":
+                    raise ValueError(f"Unseen value '{value}' for {col}")
+                unseen.append((col, value))
+                code = self.missing_code
+            row[i] = code
+        return row, unseen
+
+    def cache_key(self, row):
+        return self.version, row.tobytes()
+
+    def _lookup(self, user_input):
+        # (career, smoothed probabilities) of the leaf the answers reach, via the shared cache
+        row, unseen = self.encode(user_input)
+        key = self.cache_key(row)
+        result = self.cache.get(key)
+        if result is None:
+            if self.tree is not None:
+                leaf = self.tree.apply_row(row)
+                result = (self.node_labels[leaf], self.node_proba[leaf])
+            else:
+                proba = self.predict_proba(row[None])[0]
+                result = (self.class_labels[proba.argmax()], proba)
+            self.cache.put(key, result)
+        return result, unseen
+
+    def predict(self, user_input):
+        result, unseen = self._lookup(user_input)
+        return result[0], unseen
+
+    def predict_top_k(self, user_input, k=TOP_K):
+        # Ranked [(career, probability), ...] read off the same leaf as predict()
+        result, unseen = self._lookup(user_input)
+        labels, proba = self.top_k(result[1], k)
+        return list(zip(labels[0].tolist(), proba[0].tolist())), unseen
+
+    def top_k(self, proba, k=TOP_K):
+        return top_k(proba, self.class_labels, k)
+
+    def contributions(self, user_input, k=5):
+        # The k features that moved this prediction most, as [(feature, contribution), ...]
+        if self.tree is None:
+            return []
+        row, _ = self.encode(user_input)
+        values = self.leaf_contributions[self.tree.apply_row(row)]
+        order = np.argsort(-np.abs(values), kind="stable")[:k]
+        return [(self.features[i], float(values[i])) for i in order if values[i] != 0]
+
+    def condition(self, node, went_right):
+        # Readable form of the split at node as the row took it; label-encoded columns
+        # list the answers on that side instead of a threshold on their codes
+        col = self.features[self.tree.feature[node]]
+        threshold = self.tree.threshold[node]
+        categories = self.categories.get(col)
+        if categories is None:
+            return f"{col} {'>' if went_right else '<='} {threshold:.4g}"
+        side = [str(value) for code, value in enumerate(categories) if (code > threshold) == went_right]
+        return f"{col} in {{{', '.join(side)}}}"
+
+    def explain(self, user_input):
+        # Every split the answers crossed, root to leaf, with the change in the predicted
+        # career's probability it caused: O(depth) lookups into build-time tables.
+        # None for ensemble backends, which have no single path.
+        if self.tree is None:
+            return None
+        row, _ = self.encode(user_input)
+        path = self.tree.path_row(row)
+        leaf = path[-1]
+        c = self.node_class[leaf]
+        steps = [
+            {
+                "feature": self.features[self.tree.feature[up]],
+                "condition": self.condition(up, node == self.tree.right[up]),
+                "contribution": float(self.node_contributions[node, c]),
+            }
+            for up, node in zip(path, path[1:])
+        ]
+        return {
+            "career": self.node_labels[leaf],
+            "baseline": float(self.node_proba[0, c]),
+            "probability": float(self.node_proba[leaf, c]),
+            "steps": steps,
+        }
+
+    def unstable_features(self, user_input, candidates, answered=None):
+        # Candidates whose next item could still change the career. A trait answered with n
+        # items scores their mean m, so one more item can only move it to (n*m + x) / (n + 1)
+        # for a level code x; only those scores are tried. Of the candidates, only features
+        # tested on this row's decision path can move it to another leaf. answered maps a
+        # feature to its item count (1 when absent). Ensembles have no single path, so every
+        # candidate gets tried.
+        answered = answered or {}
+        row = self.encode(user_input)[0].copy()
+        if self.tree is not None:
+            path = self.tree.path_row(row)
+            label = self.node_labels[path[-1]]
+            on_path = {self.tree.feature[node] for node in path[:-1]}
+        else:
+            label = self.class_labels[self.predict_proba(row[None])[0].argmax()]
+            on_path = range(len(self.features))
+
+        alternatives, owners = [], []
+        for col in candidates:
+            i = self.feature_index.get(col)
+            if i is None or i not in on_path:
+                continue
+            n = answered.get(col, 1)
+            score = float(row[i])
+            for level in LEVEL_CODES:
+                if level != score:
+                    alt = row.copy()
+                    alt[i] = (n * score + level) / (n + 1)
+                    alternatives.append(alt)
+                    owners.append(col)
+        if not alternatives:
+            return []
+
+        labels = self.class_labels[self.predict_proba(np.stack(alternatives)).argmax(axis=1)]
+        flipped = {col for col, alt_label in zip(owners, labels) if alt_label != label}
+        return [col for col in candidates if col in flipped]
+
+    # -----------------------------
+    # Vectorized (batch) path
+    # -----------------------------
+    def encode_frame(self, df):
+        # Same rules as encode(), applied column-wise to a whole frame of answers
+        missing = [col for col in self.features if col not in df.columns]
+        if missing:
+            raise ValueError(f"Input is missing feature columns: {missing}")
+
+        X = np.zeros((len(df), len(self.features)), dtype=np.float32)
+        unseen = {}
+        for i, col in enumerate(self.features):
+            values = df[col]
+            table = self.code_tables.get(col)
+            if pd.api.types.is_numeric_dtype(values):
+                codes = values
+            elif table is None:
+                codes = pd.to_numeric(values, errors="coerce")
+            else:
+                codes = values.map(table)
+                # As in encode(): numbers inside a text column (e.g. 0/1/2 levels) pass through
+                # as codes, while strings must be categories ("2" is unseen, not code 2)
+                number = codes.isna() & ~values.map(lambda v: isinstance(v, str)).astype(bool)
+                codes = codes.fillna(pd.to_numeric(values.where(number), errors="coerce"))
+            # Missing answers, unknown categories and text in numeric columns: the unseen policy
+            bad = codes.isna()
+            if bad.any():
+                if self.unseen == "error":
+                    raise ValueError(f"Unseen value '{values[bad].iloc[0]}' for {col}")
+                unseen[col] = int(bad.sum())
+            X[:, i] = codes.to_numpy(dtype=np.float32, na_value=self.missing_code)
+        return X, unseen
+
+    def score(self, X):
+        # (probabilities, leaf ids); leaf ids only exist for the single-tree backend
+        if self.tree is None:
+            return smooth_proba(self.forest.predict_proba(X), 1.0, self.smoothing), None
+        leaves = self.tree.apply(X)
+        return self.node_proba[leaves], leaves
+
+    def predict_proba(self, X):
+        return self.score(X)[0]
+
+    def predict_frame(self, df):
+        X, unseen = self.encode_frame(df)
+        proba = self.predict_proba(X)
+        return self.class_labels[proba.argmax(axis=1)], proba, unseen
+
+    def reasons(self, leaves, k=3):
+        # Batch explanation: the k features with the largest path contribution for each
+        # row, as (features, contributions) arrays of shape (n_rows, k), from one gather
+        values = self.leaf_contributions[leaves]
+        idx = np.argsort(-np.abs(values), axis=1, kind="stable")[:, :k]
+        return self.feature_names[idx], np.take_along_axis(values, idx, axis=1)
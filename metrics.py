@@ -0,0 +1,148 @@
+"""Per-stage timing spans for the Streamlit app.
+
+Off unless CAREER_METRICS=1: span() then hands back one shared no-op
+context manager and timed() leaves functions undecorated, so disabled
+instrumentation costs a function call per stage. When enabled, every
+span's wall time goes into a per-process rolling window per stage
+(p50/p95/p99 over the last CAREER_METRICS_WINDOW runs, plus running
+count and sum), and write_prometheus() renders them as a Prometheus
+summary text file (CAREER_METRICS_FILE, default metrics.prom) for a local
+scraper or node_exporter's textfile collector. The app also shows the
+timings in a sidebar panel with ?debug=metrics (or CAREER_METRICS_SIDEBAR=1).
+"""
+import contextlib
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+ENABLED = os.environ.get("CAREER_METRICS", "") not in ("", "0")
+# Always show the timings panel in the app sidebar (otherwise only with ?debug=metrics)
+SIDEBAR = os.environ.get("CAREER_METRICS_SIDEBAR", "") not in ("", "0")
+METRICS_FILE = os.environ.get("CAREER_METRICS_FILE", "metrics.prom")
+WINDOW = int(os.environ.get("CAREER_METRICS_WINDOW", 1024))
+# Seconds between Prometheus file rewrites
+EXPORT_INTERVAL = float(os.environ.get("CAREER_METRICS_INTERVAL", 10))
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = "career_app_stage_seconds"
+
+# -----------------------------
+# Rolling histograms
+# -----------------------------
+class RollingHistogram:
+    # Last `window` observations for the quantiles; count and sum cover the whole process
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        values = np.quantile(np.fromiter(self.samples, dtype=float, count=len(self.samples)), QUANTILES)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            **{f"p{int(q * 100)}": float(v) for q, v in zip(QUANTILES, values)},
+        }
+
+class Registry:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = RollingHistogram(self.window)
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        # {stage: {"count", "sum", "p50", "p95", "p99"}} in first-seen order
+        with self._lock:
+            return {name: h.summary() for name, h in self._histograms.items()}
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def to_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Wall time of each app stage per rerun (quantiles over a rolling window).",
+            f"# TYPE {METRIC_NAME} summary",
+        ]
+        for stage, s in self.snapshot().items():
+            for q in QUANTILES:
+                lines.append(f'{METRIC_NAME}{{stage="{stage}",quantile="{q}"}} {s[f"p{int(q * 100)}"]:.9g}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {s["sum"]:.9g}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_FILE):
+        # Written to a temp file (one per process and thread) and renamed so a scraper
+        # never reads half a file
+        tmp_path = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "w") as fh:
+            fh.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def maybe_export(self, path=METRICS_FILE, interval=EXPORT_INTERVAL):
+        # Check and claim the slot under the lock so only one of the threads finishing
+        # reruns together writes; the write itself happens outside it (snapshot() locks)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < interval:
+                return False
+            self._last_export = now
+        try:
+            self.write_prometheus(path)
+        except OSError:
+            return False
+        return True
+
+# Shared by every session in the process
+registry = Registry()
+
+# -----------------------------
+# Spans
+# -----------------------------
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Recorded on exceptions too: st.rerun() leaves a stage by raising
+        registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+_NO_SPAN = contextlib.nullcontext()
+
+def span(name):
+    return _Span(name) if ENABLED else _NO_SPAN
+
+def timed(name):
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,270 @@
+"""Versioned model artifacts for the Career Path Predictor.
+
+Build the bundle offline (e.g. in the image build step):
+
+    python model_store.py build [--n-features 30] [--backend random_forest]
+
+The Streamlit app then only deserializes the bundle that matches the
+current training data instead of retraining on every rerun. The model
+backend defaults to a single decision tree; CAREER_MODEL_BACKEND (or
+--backend) picks an ensemble instead, and every build appends its accuracy
+and fit/predict timings to artifacts/evaluations.jsonl for comparison. Training data
+comes from original_data.pkl (validated against features_list.pkl) with the
+workbook as fallback; regenerate both snapshots from the workbook with:
+
+    python model_store.py snapshot
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+
+import metrics
+from compiled_tree import CompiledForest, CompiledTree
+from inference import Predictor, smooth_proba
+from pipeline import (
+    DATA_PATH, SNAPSHOT_PATH, FEATURES_PATH, TARGET, SELECTION_STRATEGIES, MODEL_BACKENDS,
+    data_fingerprint, load_dataset, load_training_data, write_snapshot,
+    preprocess_data, train_model,
+)
+
+# Bump whenever the bundle layout changes so stale artifacts get rebuilt
+ARTIFACT_VERSION = 11
+ARTIFACT_DIR = "artifacts"
+# One JSON line per saved bundle, to compare quality and speed across data refreshes
+EVALUATION_LOG = "evaluations.jsonl"
+N_FEATURES = 30
+SELECTION = "top_k"
+BACKEND = os.environ.get("CAREER_MODEL_BACKEND", "decision_tree")
+# Bundle entries that are scikit-learn objects; the serving artifact leaves them out so
+# loading it (and scoring with it) never imports scikit-learn
+TRAINING_KEYS = ("model",)
+
+# -----------------------------
+# Fingerprints and paths
+# -----------------------------
+def artifact_path(fingerprint, n_features=N_FEATURES, artifact_dir=ARTIFACT_DIR, backend=BACKEND,
+                  selection=SELECTION):
+    # Everything that changes the trained model is in the name, so builds never overwrite each other
+    return os.path.join(
+        artifact_dir, f"model-v{ARTIFACT_VERSION}-{fingerprint}-k{n_features}-{selection}-{backend}.joblib",
+    )
+
+def serving_path(path):
+    return f"{os.path.splitext(path)[0]}.serving.joblib"
+
+# -----------------------------
+# Build / save / load
+# -----------------------------
+def build_bundle(df, fingerprint, n_features=N_FEATURES, selection=SELECTION, backend=BACKEND):
+    with metrics.span("preprocess"):
+        df_processed, schema = preprocess_data(df)
+    X = df_processed[schema.names]
+    y = df_processed[TARGET]
+    with metrics.span("train"):
+        model, selected_features, evaluation = train_model(
+            X, y, n_features=n_features, selection=selection, backend=backend,
+        )
+    class_labels = [str(schema.target.categories[c]) for c in model.classes_]
+    evaluation["classes"] = class_labels
+    tree = CompiledTree.from_estimator(model) if backend == "decision_tree" else None
+    if backend == "hist_gradient_boosting":
+        forest = CompiledForest.from_boosting(model)
+    elif tree is None:
+        forest = CompiledForest.from_forest(model)
+    else:
+        forest = None
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "fingerprint": fingerprint,
+        "n_features": n_features,
+        "backend": backend,
+        "selection": selection,
+        # Probability smoothing fitted on the held-out split (pipeline.fit_calibration)
+        "smoothing": evaluation["smoothing"],
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": model,
+        # Everything below is plain Python / NumPy and is all the serving path needs:
+        # the feature schema (kinds and code tables, schema.py), careers in the order of
+        # the model's probability columns, and the tree (or the ensemble's trees) as node
+        # arrays (compiled_tree.py)
+        "schema": schema.to_dict(),
+        "class_labels": class_labels,
+        "selected_features": list(selected_features),
+        "importances": build_importances(model, selected_features, tree, X[selected_features], y,
+                                         evaluation["smoothing"]),
+        "evaluation": evaluation,
+        "compiled_tree": tree.to_arrays() if tree is not None else None,
+        "compiled_forest": forest.to_arrays() if forest is not None else None,
+    }
+
+def build_importances(model, selected_features, tree, X, y, smoothing):
+    # Static explanation tables rendered as-is by the UI: global importances already
+    # sorted, plus per-node and per-leaf path contributions on the same probabilities
+    # the Predictor shows, so explaining a prediction never recomputes anything
+    importances = getattr(model, "feature_importances_", None)
+    if importances is None:
+        # Boosting has no impurity importances; permute a sample, full-data runs take minutes
+        from sklearn.inspection import permutation_importance
+        importances = permutation_importance(
+            model, X, y, n_repeats=3, random_state=42, n_jobs=-1, max_samples=min(len(X), 200),
+        ).importances_mean
+    order = np.argsort(-importances, kind="stable")
+    table = {
+        "features": [selected_features[i] for i in order],
+        "values": importances[order].round(6).tolist(),
+        "node_contributions": None,
+        "leaf_contributions": None,
+    }
+    if tree is not None:
+        proba = smooth_proba(tree.proba, tree.n_samples, smoothing)
+        table.update(
+            node_contributions=tree.node_contributions(proba),
+            leaf_contributions=tree.leaf_contributions(proba),
+        )
+    return table
+
+def _dump(obj, path):
+    # Write to a temp file first so a concurrent reader never sees a partial bundle
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+def save_bundle(bundle, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _dump(bundle, path)
+    _dump({k: v for k, v in bundle.items() if k not in TRAINING_KEYS}, serving_path(path))
+
+    record = {
+        "artifact": os.path.basename(path),
+        "built_at": bundle["built_at"],
+        "fingerprint": bundle["fingerprint"],
+        "n_features": bundle["n_features"],
+        **bundle["evaluation"],
+    }
+    with open(os.path.join(os.path.dirname(path) or ".", EVALUATION_LOG), "a") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+def load_bundle(path):
+    if not os.path.exists(path):
+        return None
+    bundle = joblib.load(path)
+    if not isinstance(bundle, dict) or bundle.get("version") != ARTIFACT_VERSION:
+        return None
+    return bundle
+
+def load_or_build(data_path=DATA_PATH, n_features=N_FEATURES, artifact_dir=ARTIFACT_DIR,
+                  snapshot_path=SNAPSHOT_PATH, serving=True, backend=BACKEND, selection=SELECTION):
+    fingerprint = data_fingerprint(data_path, snapshot_path)
+    path = artifact_path(fingerprint, n_features, artifact_dir, backend, selection)
+    # The serving artifact is enough for predictions; the full one also has the sklearn objects
+    for candidate in ([serving_path(path)] if serving else []) + [path]:
+        bundle = load_bundle(candidate)
+        if bundle is not None:
+            return bundle
+
+    # No prebuilt artifact for this data: train once and try to persist it
+    bundle = build_bundle(load_training_data(data_path, snapshot_path), fingerprint, n_features, selection, backend)
+    try:
+        save_bundle(bundle, path)
+    except OSError:
+        pass
+    return bundle
+
+# -----------------------------
+# Process-wide cache
+# -----------------------------
+# Shared by every session in the process; one entry per (data source, n_features, selection, backend),
+# replaced as soon as the content fingerprint of the source files changes
+_cache = {}
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+def get_bundle(data_path=DATA_PATH, n_features=N_FEATURES, artifact_dir=ARTIFACT_DIR,
+               snapshot_path=SNAPSHOT_PATH, serving=True, backend=BACKEND, selection=SELECTION):
+    fingerprint = data_fingerprint(data_path, snapshot_path)
+    key = (os.path.abspath(data_path), snapshot_path, n_features, serving, backend, selection)
+    with _cache_lock:
+        bundle = _cache.get(key)
+        if bundle is not None and bundle["fingerprint"] == fingerprint:
+            _cache_stats["hits"] += 1
+            return bundle
+
+        # Built under the lock so concurrent sessions wait for one fit instead of each training
+        _cache_stats["misses"] += 1
+        bundle = load_or_build(data_path, n_features, artifact_dir, snapshot_path, serving, backend, selection)
+        # Inference tables are compiled at load time and live only in memory
+        bundle = dict(bundle, predictor=Predictor(bundle))
+        _cache[key] = bundle
+        return bundle
+
+def cache_stats():
+    with _cache_lock:
+        return dict(_cache_stats, entries=len(_cache))
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats.update(hits=0, misses=0)
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the career model artifact.")
+    parser.add_argument("command", choices=["build", "show", "snapshot"])
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    parser.add_argument("--features", default=FEATURES_PATH)
+    parser.add_argument("--no-snapshot", action="store_true", help="train from the workbook only")
+    parser.add_argument("--n-features", type=int, default=N_FEATURES)
+    parser.add_argument("--selection", choices=SELECTION_STRATEGIES, default=SELECTION,
+                        help="feature selection strategy (part of the artifact name)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS, default=BACKEND,
+                        help="model trained (and recorded) in the artifact")
+    parser.add_argument("--artifact-dir", default=ARTIFACT_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        # Regenerate original_data.pkl / features_list.pkl from the workbook
+        columns = write_snapshot(load_dataset(args.data), args.snapshot, args.features)
+        print(f"Wrote {args.snapshot} and {args.features} ({len(columns)} columns)")
+        return 0
+
+    snapshot_path = None if args.no_snapshot else args.snapshot
+    fingerprint = data_fingerprint(args.data, snapshot_path, args.features)
+    path = artifact_path(fingerprint, args.n_features, args.artifact_dir, args.backend, args.selection)
+
+    if args.command == "build":
+        df = load_training_data(args.data, snapshot_path, args.features)
+        bundle = build_bundle(df, fingerprint, args.n_features, args.selection, args.backend)
+        save_bundle(bundle, path)
+        evaluation = bundle["evaluation"]
+        print(f"Wrote {path} and {serving_path(path)}")
+        print(f"{args.backend}: accuracy {evaluation['accuracy']:.3f}, "
+              f"mean top probability {evaluation['mean_top_proba']:.3f} "
+              f"(smoothing {evaluation['smoothing']:.3g}, raw {evaluation['mean_top_proba_raw']:.3f}), "
+              f"selection {evaluation['selection_seconds']:.2f}s, fit {evaluation['fit_seconds']:.2f}s, "
+              f"predict {evaluation['predict_rows_per_second']:,.0f} rows/s")
+    else:
+        bundle = load_bundle(path)
+        if bundle is None:
+            print(f"No artifact for the current data at {path}")
+            return 1
+        print(f"{path}: {bundle['backend']} built {bundle['built_at']}, "
+              f"{len(bundle['selected_features'])} features ({bundle.get('selection', SELECTION)}), "
+              f"{len(bundle['class_labels'])} careers")
+        evaluation = bundle["evaluation"]
+        print(f"held-out accuracy {evaluation['accuracy']:.3f} (macro F1 {evaluation['f1_macro']:.3f}), "
+              f"fit {evaluation['fit_seconds'] * 1000:.1f} ms, "
+              f"predict {evaluation['predict_rows_per_second']:,.0f} rows/s, "
+              f"{evaluation['n_trees']} trees, depth {evaluation['tree_depth']}, {evaluation['n_leaves']} leaves")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,331 @@
+import hashlib
+import os
+import time
+
+import joblib
+import pandas as pd
+import numpy as np
+
+from inference import fit_smoothing, smooth_proba
+from schema import Schema
+
+# scikit-learn is imported inside the training functions below: loading data and
+# serving a prebuilt model never need it, and it dominates cold-start import time.
+
+# -----------------------------
+# Data source
+# -----------------------------
+DATA_PATH = "new updated datas.xlsx"
+SHEET_NAME = "in"
+TARGET = "Predicted_Career_Field"
+
+# Pickled training frame and its column schema (last entry is the target)
+SNAPSHOT_PATH = "original_data.pkl"
+FEATURES_PATH = "features_list.pkl"
+
+def read_workbook(path=DATA_PATH):
+    return pd.read_excel(path, sheet_name=SHEET_NAME)
+
+# (path, size, mtime_ns) -> content hash, so unchanged files are only hashed once
+_fingerprints = {}
+
+def file_fingerprint(path=DATA_PATH):
+    stat = os.stat(path)
+    stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    fingerprint = _fingerprints.get(stat_key)
+    if fingerprint is None:
+        digest = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint = digest.hexdigest()[:16]
+        _fingerprints[stat_key] = fingerprint
+    return fingerprint
+
+# -----------------------------
+# Columnar cache of the workbook
+# -----------------------------
+# The "in" sheet is parsed through openpyxl once and stored next to the workbook as
+# an .npz: numeric columns as-is, text columns as int codes plus a category table.
+def columnar_cache_path(path=DATA_PATH):
+    return f"{os.path.splitext(path)[0]}.{SHEET_NAME}.npz"
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def write_columnar_cache(df, path=DATA_PATH):
+    size, mtime_ns = _source_stamp(path)
+    arrays = {
+        "columns": np.array([str(col) for col in df.columns]),
+        "source_stamp": np.array([size, mtime_ns], dtype=np.int64),
+        "source_hash": np.array(file_fingerprint(path)),
+    }
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            arrays[f"values_{i}"] = values.to_numpy()
+        else:
+            codes, categories = pd.factorize(values, sort=True)
+            arrays[f"codes_{i}"] = codes.astype(np.int32)
+            arrays[f"categories_{i}"] = np.array([str(c) for c in categories])
+
+    cache_path = columnar_cache_path(path)
+    tmp_path = f"{cache_path}.tmp{os.getpid()}.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+def read_columnar_cache(path=DATA_PATH):
+    cache_path = columnar_cache_path(path)
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path, allow_pickle=False) as cache:
+        # Same size/mtime is trusted as-is; otherwise only a matching content hash keeps it
+        stamp = tuple(int(v) for v in cache["source_stamp"])
+        if stamp != _source_stamp(path) and str(cache["source_hash"]) != file_fingerprint(path):
+            return None
+
+        data = {}
+        for i, col in enumerate(cache["columns"]):
+            if f"values_{i}" in cache.files:
+                data[str(col)] = cache[f"values_{i}"]
+            else:
+                codes = cache[f"codes_{i}"]
+                categories = cache[f"categories_{i}"].astype(object)
+                column = categories[codes.clip(min=0)] if len(categories) else np.full(len(codes), None, dtype=object)
+                column[codes < 0] = None
+                data[str(col)] = column
+    return pd.DataFrame(data)
+
+def load_dataset(path=DATA_PATH):
+    df = read_columnar_cache(path)
+    if df is not None:
+        return df
+
+    # Cache missing or stale: parse the workbook and (re)build the cache next to it
+    df = read_workbook(path)
+    try:
+        write_columnar_cache(df, path)
+    except OSError:
+        pass
+    return df
+
+# -----------------------------
+# Enhanced Preprocessing
+# -----------------------------
+def build_schema(df, features_path=FEATURES_PATH):
+    # Kinds and code tables inferred from the data, in features_list.pkl column order
+    columns = None
+    if features_path and os.path.exists(features_path):
+        listed = list(joblib.load(features_path))
+        if all(col in df.columns for col in listed):
+            columns = listed
+    return Schema.from_frame(df, TARGET, columns)
+
+def preprocess_data(df, schema=None):
+    # int8 codes from the schema's fixed tables (Low/Medium/High -> 0/1/2, as the form
+    # sends them) and float32 numbers; the schema travels with the model artifact
+    if schema is None:
+        schema = build_schema(df)
+    return schema.encode(df), schema
+
+# -----------------------------
+# Feature Selection
+# -----------------------------
+SELECTION_STRATEGIES = ("top_k", "threshold", "permutation")
+
+def select_features(clf, X, y, strategy="top_k", n_features=10, threshold="mean", n_jobs=-1):
+    # clf must already be fitted on X: the selector reuses that fit (prefit) instead of
+    # cloning and refitting it. Returns a SelectFromModel usable as a pipeline stage.
+    from sklearn.feature_selection import SelectFromModel
+
+    if strategy == "top_k":
+        return SelectFromModel(clf, prefit=True, max_features=n_features, threshold=-np.inf)
+    if strategy == "threshold":
+        return SelectFromModel(clf, prefit=True, threshold=threshold)
+    if strategy == "permutation":
+        from sklearn.inspection import permutation_importance
+        result = permutation_importance(clf, X, y, n_repeats=5, random_state=42, n_jobs=n_jobs)
+        importances = result.importances_mean
+        return SelectFromModel(
+            clf, prefit=True, max_features=n_features, threshold=-np.inf,
+            importance_getter=lambda estimator: importances,
+        )
+    raise ValueError(f"Unknown selection strategy '{strategy}', expected one of {SELECTION_STRATEGIES}")
+
+# -----------------------------
+# Held-out Evaluation
+# -----------------------------
+def evaluate_model(clf, X_test, y_test):
+    from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
+
+    start = time.perf_counter()
+    y_pred = clf.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    labels = clf.classes_
+    return {
+        "n_test": int(len(X_test)),
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "f1_macro": float(f1_score(y_test, y_pred, labels=labels, average="macro", zero_division=0)),
+        # Aligned with clf.classes_ (encoded target codes)
+        "f1_per_class": [float(v) for v in f1_score(y_test, y_pred, labels=labels, average=None, zero_division=0)],
+        "confusion_matrix": confusion_matrix(y_test, y_pred, labels=labels).tolist(),
+        "predict_seconds": predict_seconds,
+        "predict_rows_per_second": len(X_test) / predict_seconds if predict_seconds > 0 else float("inf"),
+        **model_size(clf),
+    }
+
+def fit_calibration(clf, X_test, y_test):
+    # Smoothing pseudo-count for the model's probabilities, fitted on the held-out split, plus
+    # the mean top probability before and after it (to compare with the accuracy). The
+    # tree smooths each leaf by its training count; ensembles blend toward uniform.
+    proba = clf.predict_proba(X_test)
+    if hasattr(clf, "tree_"):
+        n_samples = clf.tree_.weighted_n_node_samples[clf.apply(X_test)]
+    else:
+        n_samples = np.ones(len(X_test))
+    y = np.asarray(y_test)
+    y_index = np.searchsorted(clf.classes_, y).clip(0, len(clf.classes_) - 1)
+    y_index = np.where(clf.classes_[y_index] == y, y_index, -1)
+    alpha = fit_smoothing(proba, n_samples, y_index)
+    return {
+        "smoothing": alpha,
+        "mean_top_proba_raw": float(proba.max(axis=1).mean()),
+        "mean_top_proba": float(smooth_proba(proba, n_samples, alpha).max(axis=1).mean()),
+    }
+
+def model_size(clf):
+    # Tree count, deepest tree and node totals; what inference cost scales with
+    if hasattr(clf, "tree_"):
+        trees = [clf.tree_]
+    elif hasattr(clf, "estimators_"):
+        trees = [est.tree_ for est in clf.estimators_]
+    else:
+        trees = [predictor.nodes for per_class in clf._predictors for predictor in per_class]
+        return {
+            "n_trees": len(trees),
+            "tree_depth": int(max(nodes["depth"].max() for nodes in trees)),
+            "n_leaves": int(sum(nodes["is_leaf"].sum() for nodes in trees)),
+            "n_nodes": int(sum(len(nodes) for nodes in trees)),
+        }
+    return {
+        "n_trees": len(trees),
+        "tree_depth": int(max(tree.max_depth for tree in trees)),
+        "n_leaves": int(sum(tree.n_leaves for tree in trees)),
+        "n_nodes": int(sum(tree.node_count for tree in trees)),
+    }
+
+# -----------------------------
+# Model backends
+# -----------------------------
+MODEL_BACKENDS = ("decision_tree", "random_forest", "extra_trees", "hist_gradient_boosting")
+# Backend whose fit ranks the features for another: boosting exposes no feature_importances_
+# and permutation importance over 51 classes x 100 iterations takes minutes
+SELECTION_BACKENDS = {"hist_gradient_boosting": "extra_trees"}
+
+def make_estimator(backend="decision_tree", n_jobs=-1):
+    if backend == "decision_tree":
+        from sklearn.tree import DecisionTreeClassifier
+        return DecisionTreeClassifier(random_state=42)
+    if backend == "random_forest":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=100, n_jobs=n_jobs, random_state=42)
+    if backend == "extra_trees":
+        from sklearn.ensemble import ExtraTreesClassifier
+        return ExtraTreesClassifier(n_estimators=100, n_jobs=n_jobs, random_state=42)
+    if backend == "hist_gradient_boosting":
+        # Threads come from OpenMP (all cores by default); there is no n_jobs parameter
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(random_state=42)
+    raise ValueError(f"Unknown model backend '{backend}', expected one of {MODEL_BACKENDS}")
+
+# -----------------------------
+# Train Model with Feature Selection
+# -----------------------------
+def train_model(X, y, n_features=10, selection="top_k", threshold="mean", backend="decision_tree", n_jobs=-1):
+    from sklearn.model_selection import train_test_split
+
+    train_start = time.perf_counter()
+
+    # Split first: the test rows must not help pick the features they are scored on
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # First train to get feature importances
+    selection_backend = SELECTION_BACKENDS.get(backend, backend)
+    clf = make_estimator(selection_backend, n_jobs)
+    clf.fit(X_train, y_train)
+    
+    # Select features from that fit (top N by default)
+    selector = select_features(clf, X_train, y_train, strategy=selection, n_features=n_features,
+                               threshold=threshold, n_jobs=n_jobs)
+    selected_features = X.columns[selector.get_support()]
+    selection_seconds = time.perf_counter() - train_start
+    
+    # Retrain with selected features
+    X_train, X_test = X_train[selected_features], X_test[selected_features]
+    clf = make_estimator(backend, n_jobs)
+    fit_start = time.perf_counter()
+    clf.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_start
+
+    # Score the held-out split that used to be thrown away
+    evaluation = evaluate_model(clf, X_test, y_test)
+    evaluation.update(fit_calibration(clf, X_test, y_test))
+    evaluation.update(
+        backend=backend,
+        selection=selection,
+        selection_backend=selection_backend,
+        n_jobs=n_jobs,
+        n_train=int(len(X_train)),
+        selection_seconds=selection_seconds,
+        fit_seconds=fit_seconds,
+        train_seconds=time.perf_counter() - train_start,
+    )
+    
+    return clf, selected_features, evaluation
+
+# -----------------------------
+# Training data snapshot
+# -----------------------------
+def load_snapshot(snapshot_path=SNAPSHOT_PATH, features_path=FEATURES_PATH):
+    features = list(joblib.load(features_path))
+    if not features or features[-1] != TARGET:
+        raise ValueError(f"{features_path} must list the feature columns followed by {TARGET}")
+
+    df = joblib.load(snapshot_path)
+    if not isinstance(df, pd.DataFrame):
+        raise ValueError(f"{snapshot_path} does not contain a DataFrame")
+    if list(df.columns) != features:
+        missing = [col for col in features if col not in df.columns]
+        extra = [col for col in df.columns if col not in features]
+        raise ValueError(
+            f"{snapshot_path} does not match {features_path} "
+            f"(missing: {missing or 'none'}, unexpected: {extra or 'none'}, or columns out of order)"
+        )
+    if df.empty or df[TARGET].isna().any():
+        raise ValueError(f"{snapshot_path} has no usable {TARGET} labels")
+    return df
+
+def write_snapshot(df, snapshot_path=SNAPSHOT_PATH, features_path=FEATURES_PATH):
+    columns = [col for col in df.columns if col != TARGET] + [TARGET]
+    joblib.dump(df[columns], snapshot_path)
+    joblib.dump(columns, features_path)
+    return columns
+
+def load_training_data(data_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH, features_path=FEATURES_PATH):
+    # Validated snapshot first; the workbook (via its columnar cache) is the fallback
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            return load_snapshot(snapshot_path, features_path)
+        except (OSError, ValueError, EOFError, ImportError, AttributeError, KeyError) as e:
+            print(f"Ignoring snapshot {snapshot_path}: {e}")
+    return load_dataset(data_path)
+
+def data_fingerprint(data_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH, features_path=FEATURES_PATH):
+    # Covers every file load_training_data() may read, so any refresh invalidates models
+    parts = []
+    for path in (data_path, snapshot_path, features_path):
+        parts.append(file_fingerprint(path) if path and os.path.exists(path) else "-")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
@@ -0,0 +1,126 @@
+"""On-demand profiling of single Streamlit reruns.
+
+Opt in for the first N reruns of a process with CAREER_PROFILE=N, or per
+rerun with the ?profile=1 query parameter (removed again after one use)
+once CAREER_PROFILE_QUERY=1 allows it; without that setting visitors
+cannot start profiles. The rerun then runs under cProfile (every Python
+call, pandas/NumPy/sklearn internals included) and tracemalloc, and two
+files land in CAREER_PROFILE_DIR (default profiles/):
+
+    rerun-<timestamp>-<pid>.prof   pstats data (python -m pstats, snakeviz)
+    rerun-<timestamp>-<pid>.txt    top functions by cumulative time, plus
+                                   peak traced memory and the top allocation sites
+
+Only the newest CAREER_PROFILE_KEEP (default 20) profiles are kept; older
+ones are deleted as new ones are written. Only one rerun is profiled at a
+time per process; tracemalloc is process-wide, so allocations made by
+other sessions meanwhile are included.
+When not requested, maybe_profile() costs one env counter check.
+"""
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+PROFILE_DIR = os.environ.get("CAREER_PROFILE_DIR", "profiles")
+# Whether the ?profile=1 query parameter may start a profile (off: any visitor could)
+ALLOW_QUERY = os.environ.get("CAREER_PROFILE_QUERY", "") not in ("", "0")
+# Profiles (.prof + .txt pairs) kept in PROFILE_DIR
+KEEP = int(os.environ.get("CAREER_PROFILE_KEEP", 20))
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 10
+TOP_FUNCTIONS = 60
+TOP_ALLOCATIONS = 30
+
+# Reruns still to profile because of CAREER_PROFILE, and the one-profile-at-a-time guard
+_remaining = [int(os.environ.get("CAREER_PROFILE", 0) or 0)]
+_remaining_lock = threading.Lock()
+_active = threading.Lock()
+
+def _requested_by_env():
+    if _remaining[0] <= 0:
+        return False
+    with _remaining_lock:
+        if _remaining[0] <= 0:
+            return False
+        _remaining[0] -= 1
+        return True
+
+def profile_path(profile_dir=PROFILE_DIR):
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+    return os.path.join(profile_dir, f"rerun-{stamp}-{os.getpid()}")
+
+def prune(profile_dir=PROFILE_DIR, keep=KEEP):
+    # Timestamped names sort oldest first
+    bases = sorted(name[:-len(".prof")] for name in os.listdir(profile_dir)
+                   if name.startswith("rerun-") and name.endswith(".prof"))
+    for base in bases[:max(0, len(bases) - keep)]:
+        for ext in (".prof", ".txt"):
+            try:
+                os.remove(os.path.join(profile_dir, base + ext))
+            except OSError:
+                pass
+
+# -----------------------------
+# Capture
+# -----------------------------
+def write_report(profiler, snapshot, peak, elapsed, base):
+    profiler.dump_stats(f"{base}.prof")
+    out = io.StringIO()
+    out.write(f"Rerun wall time: {elapsed * 1000:.1f} ms\n")
+    if snapshot is not None:
+        out.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+    out.write("\n")
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    if snapshot is not None:
+        out.write(f"\nTop {TOP_ALLOCATIONS} allocation sites still alive at the end of the rerun:\n")
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            out.write(f"{stat}\n")
+    with open(f"{base}.txt", "w") as fh:
+        fh.write(out.getvalue())
+
+@contextlib.contextmanager
+def profile(profile_dir=PROFILE_DIR):
+    # Yields the base path of the files written (without extension) once the block exits
+    os.makedirs(profile_dir, exist_ok=True)
+    base = profile_path(profile_dir)
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield base
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracemalloc:
+            tracemalloc.stop()
+        try:
+            write_report(profiler, snapshot, peak, elapsed, base)
+            prune(profile_dir)
+            print(f"Profile of one rerun written to {base}.prof / {base}.txt")
+        except OSError as e:
+            print(f"Could not write profile {base}: {e}")
+
+@contextlib.contextmanager
+def maybe_profile(requested=False, profile_dir=PROFILE_DIR):
+    # Profiles the block when asked (the app checks ALLOW_QUERY) or while CAREER_PROFILE has runs left;
+    # yields the base path of the profile files, or None when not profiling
+    if not (requested or _requested_by_env()) or not _active.acquire(blocking=False):
+        yield None
+        return
+    try:
+        with profile(profile_dir) as base:
+            yield base
+    finally:
+        _active.release()
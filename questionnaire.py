@@ -0,0 +1,137 @@
+import json
+import os
+import secrets
+import threading
+import zlib
+
+# Editable question bank: {feature: [{"question": ..., "options": {label: answer}}, ...]}.
+# Every answer must be a category of that feature in the model schema (schema.py).
+QUESTIONS_PATH = "questions.json"
+
+# Most items asked for one Low/Medium/High trait before its score is taken as final
+MAX_ITEMS_PER_TRAIT = 3
+
+# -----------------------------
+# Compiled question bank
+# -----------------------------
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+class Question(_Frozen):
+    # options[i] is the label shown to the user, levels[i] the answer it stands for and
+    # values[i] what is sent to the model: the schema code for ordinal traits (so items
+    # can be averaged), the answer itself for other kinds
+    __slots__ = ("text", "options", "levels", "values")
+
+    def __init__(self, text, options, spec):
+        levels = tuple(options.values())
+        if spec.kind != "numeric":
+            missing = [level for level in levels if level not in spec.codes]
+            if missing:
+                raise ValueError(f"{spec.name}: '{text}' has answers with no code in the model schema "
+                                 f"{missing}, expected some of {list(spec.categories)}")
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "options", tuple(options))
+        object.__setattr__(self, "levels", levels)
+        object.__setattr__(self, "values", tuple(spec.codes[level] for level in levels)
+                           if spec.kind == "ordinal" else levels)
+
+class FeatureQuestions(_Frozen):
+    # ordinal (per the schema): every answer is a level code, so several items can be
+    # averaged into one continuous trait score. widget_keys[j] is the key of the j-th item shown.
+    __slots__ = ("feature", "questions", "widget_keys", "ordinal")
+
+    def __init__(self, spec, questions):
+        object.__setattr__(self, "feature", spec.name)
+        object.__setattr__(self, "questions", tuple(questions))
+        object.__setattr__(self, "widget_keys", (f"q_{spec.name}",) + tuple(
+            f"q_{spec.name}_{j}" for j in range(1, len(self.questions))
+        ))
+        object.__setattr__(self, "ordinal", spec.kind == "ordinal")
+
+    def items(self, seed, count):
+        # The seeded question first, then the following ones in bank order
+        start = question_index(seed, self.feature, len(self.questions))
+        count = min(count, len(self.questions))
+        return tuple(self.questions[(start + j) % len(self.questions)] for j in range(count))
+
+    def max_items(self):
+        return min(MAX_ITEMS_PER_TRAIT, len(self.questions)) if self.ordinal else 1
+
+class QuestionBank(_Frozen):
+    __slots__ = ("features", "_index")
+
+    # Compiled against the model schema, so an answer training has no code for fails here,
+    # when the bank loads, instead of being mapped to some default at submit time. Features
+    # the schema lacks (e.g. a column only the snapshot has) are skipped: never asked.
+    def __init__(self, raw, schema):
+        index = {}
+        for feature, questions in raw.items():
+            if feature not in schema:
+                continue
+            compiled = [Question(q["question"], q["options"], schema[feature]) for q in questions if q.get("options")]
+            if compiled:
+                index[feature] = FeatureQuestions(schema[feature], compiled)
+        object.__setattr__(self, "features", tuple(index))
+        object.__setattr__(self, "_index", index)
+
+    def __contains__(self, feature):
+        return feature in self._index
+
+    def __getitem__(self, feature):
+        return self._index[feature]
+
+    def get(self, feature):
+        return self._index.get(feature)
+
+# -----------------------------
+# Seeded question selection
+# -----------------------------
+# A session is identified by one small integer seed; which question each feature shows is
+# a pure function of it, so any worker can rebuild (or replay) the exact same form.
+def new_question_seed():
+    return secrets.randbelow(1 << 31)
+
+def question_index(seed, feature, n_questions):
+    # crc32 rather than hash(): stable across processes and Python versions
+    return zlib.crc32(f"{seed}:{feature}".encode()) % n_questions
+
+def format_trait_items(trait_items):
+    # {feature: items shown} <-> "Feature:2,Other:3", the URL form of the follow-up state;
+    # with the seed it rebuilds a form after follow-ups were added
+    return ",".join(f"{feature}:{n}" for feature, n in trait_items.items() if n > 1)
+
+def parse_trait_items(text):
+    items = {}
+    for part in (text or "").split(","):
+        feature, _, n = part.partition(":")
+        if feature and n.isdigit() and int(n) > 1:
+            items[feature] = min(int(n), MAX_ITEMS_PER_TRAIT)
+    return items
+
+def aggregate_answers(values):
+    # Mean level across the items answered for one trait (a continuous 0..2 score)
+    return sum(values) / len(values) if len(values) > 1 else values[0]
+
+# Compiled once per process and schema content, shared by all sessions; one bank per file is
+# kept, recompiled when the file or the schema changes
+_banks = {}
+_banks_lock = threading.Lock()
+
+def load_question_bank(schema, path=QUESTIONS_PATH):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, schema.digest)
+    bank = _banks.get(key)
+    if bank is None:
+        with _banks_lock:
+            bank = _banks.get(key)
+            if bank is None:
+                with open(path, encoding="utf-8") as fh:
+                    bank = QuestionBank(json.load(fh), schema)
+                for stale in [k for k in _banks if k[0] == key[0]]:
+                    del _banks[stale]
+                _banks[key] = bank
+    return bank
@@ -0,0 +1,117 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Feature kinds and fixed levels
+# -----------------------------
+KINDS = ("ordinal", "nominal", "binary", "numeric")
+
+# Code order of Low/Medium/High answers, shared by training, the model and the questionnaire
+ORDINAL_LEVELS = ("Low", "Medium", "High")
+BINARY_LEVELS = ("No", "Yes")
+
+# Code stored for missing values and unknown categories, in training and at serving time
+MISSING_CODE = -1
+
+def _code_dtype(n_categories):
+    return np.int8 if n_categories <= np.iinfo(np.int8).max else np.int16
+
+# -----------------------------
+# Compiled schema
+# -----------------------------
+class Feature:
+    # One column: its kind and, for categorical kinds, the fixed code table
+    # (categories[code] is the answer that code stands for)
+    __slots__ = ("name", "kind", "categories", "codes", "dtype")
+
+    def __init__(self, name, kind, categories=()):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown feature kind '{kind}' for {name}, expected one of {KINDS}")
+        self.name = name
+        self.kind = kind
+        self.categories = tuple(categories)
+        self.codes = {value: code for code, value in enumerate(self.categories)}
+        self.dtype = np.float32 if kind == "numeric" else _code_dtype(len(self.categories))
+
+    @classmethod
+    def infer(cls, name, values):
+        if pd.api.types.is_numeric_dtype(values):
+            return cls(name, "numeric")
+        seen = {str(v) for v in pd.unique(values.dropna())}
+        if seen <= set(ORDINAL_LEVELS):
+            return cls(name, "ordinal", ORDINAL_LEVELS)
+        if seen == set(BINARY_LEVELS):
+            return cls(name, "binary", BINARY_LEVELS)
+        if len(seen) == 2:
+            return cls(name, "binary", sorted(seen))
+        return cls(name, "nominal", sorted(seen))
+
+    def to_dict(self):
+        return {"name": self.name, "kind": self.kind, "categories": list(self.categories)}
+
+class Schema:
+    # Every model column plus the target, in features_list.pkl order. Training encodes
+    # the data with it and the artifact carries it, so the submit path compiles its code
+    # tables from exactly the same declaration. missing_code is the one code every path
+    # writes for a missing or unknown answer, numeric columns included.
+    __slots__ = ("features", "target", "missing_code", "digest", "_index")
+
+    def __init__(self, features, target, missing_code=MISSING_CODE):
+        self.features = tuple(features)
+        self.target = target
+        self.missing_code = missing_code
+        self._index = {f.name: f for f in self.features + (target,)}
+        # Content hash: equal declarations (e.g. the same schema from two bundle loads) share it
+        self.digest = hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()[:16]
+
+    @classmethod
+    def from_frame(cls, df, target, columns=None):
+        columns = [col for col in (columns or df.columns) if col != target]
+        return cls([Feature.infer(col, df[col]) for col in columns], Feature.infer(target, df[target]))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([Feature(**f) for f in data["features"]], Feature(**data["target"]), data["missing_code"])
+
+    def to_dict(self):
+        return {
+            "features": [f.to_dict() for f in self.features],
+            "target": self.target.to_dict(),
+            "missing_code": self.missing_code,
+        }
+
+    def __getitem__(self, name):
+        return self._index[name]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def names(self):
+        return [f.name for f in self.features]
+
+    def encode(self, df):
+        # Categorical columns become int8 codes through their fixed tables, numeric ones
+        # float32, with missing_code for blanks and unknown categories. All text cells are
+        # factorized together (a single hash pass) and each column's codes remapped through
+        # a small lookup built from its table.
+        specs = self.features + (self.target,)
+        categorical = [f for f in specs if f.kind != "numeric"]
+        n_rows = len(df)
+        encoded = {}
+        if categorical:
+            block = df[[f.name for f in categorical]].to_numpy(dtype=object)
+            global_codes, uniques = pd.factorize(block.ravel(order="F"))
+            global_codes = global_codes.reshape(len(categorical), n_rows)
+            for j, f in enumerate(categorical):
+                # The extra slot maps missing values (factorize code -1) to missing_code
+                missing = self.missing_code
+                lookup = np.array([f.codes.get(str(u), missing) for u in uniques] + [missing], dtype=f.dtype)
+                encoded[f.name] = lookup[global_codes[j]]
+        for f in specs:
+            if f.kind == "numeric":
+                encoded[f.name] = df[f.name].to_numpy(dtype=np.float32, na_value=self.missing_code)
+        return pd.DataFrame({f.name: encoded[f.name] for f in specs}, index=df.index, copy=False)
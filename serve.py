@@ -0,0 +1,241 @@
+"""Local JSON prediction service next to the Streamlit UI.
+
+    python serve.py [--port 8601] [--workers 32] [--max-batch 64] [--max-wait-ms 2]
+
+POST /predict with {"answers": {feature: answer, ...}} (or a list of such
+dicts) and an optional "top_k" (default 3) and get back the predicted career,
+its probability and the k most likely careers with their probabilities.
+"explain": true adds the decision path: every split the answers crossed and
+how much it moved the predicted career's probability (null for ensemble
+backends, which have no single path).
+Missing (null) answers and answers the model has no code for are scored
+with the schema's missing code and listed under "unseen"; requests missing a
+feature altogether get a 422.
+GET /health reports the loaded model, batching counters and the prediction
+cache hit rate. Requests that arrive together are micro-batched into a
+single predict_proba call; answer sets seen before are served from the
+process-wide prediction cache.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+
+import model_store
+from inference import TOP_K
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    # Answers queued by concurrent request threads are encoded into one matrix and
+    # scored with a single predict_proba call per batch.
+    def __init__(self, predictor, max_batch=64, max_wait=0.002):
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, answers):
+        future = Future()
+        self._queue.put((answers, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            predictor = self.predictor
+            X = np.zeros((len(batch), len(predictor.features)), dtype=np.float32)
+            ok = []
+            for i, (answers, future) in enumerate(batch):
+                try:
+                    _, unseen = predictor.encode(answers, out=X[i])
+                except (KeyError, TypeError, ValueError) as e:
+                    future.set_exception(e)
+                    continue
+                # Answer vectors already scored by any client or session skip the model
+                cached = predictor.cache.get(predictor.cache_key(X[i]))
+                if cached is not None:
+                    future.set_result((cached[1], unseen))
+                else:
+                    ok.append((i, future, unseen))
+
+            if ok:
+                rows = [i for i, _, _ in ok]
+                try:
+                    proba = predictor.predict_proba(X[rows])
+                except Exception as e:
+                    for _, future, _ in ok:
+                        future.set_exception(e)
+                else:
+                    for j, (i, future, unseen) in enumerate(ok):
+                        label = predictor.class_labels[proba[j].argmax()]
+                        predictor.cache.put(predictor.cache_key(X[i]), (label, proba[j]))
+                        future.set_result((proba[j], unseen))
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+def format_result(labels, proba, unseen):
+    # One row of Predictor.top_k output
+    return {
+        "career": labels[0],
+        "probability": round(proba[0], 6),
+        "top_k": [{"career": c, "probability": round(p, 6)} for c, p in zip(labels, proba)],
+        "unseen": {col: value for col, value in unseen},
+    }
+
+# -----------------------------
+# HTTP layer
+# -----------------------------
+class PooledHTTPServer(HTTPServer):
+    # Connections are handled by a fixed worker pool instead of a thread per request
+    request_queue_size = 256
+
+    def __init__(self, address, handler, batcher, bundle, workers=32):
+        super().__init__(address, handler)
+        self.batcher = batcher
+        self.bundle = bundle
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        bundle = self.server.bundle
+        self._send_json(200, {
+            "status": "ok",
+            "fingerprint": bundle["fingerprint"],
+            "backend": bundle["backend"],
+            "built_at": bundle["built_at"],
+            "features": bundle["selected_features"],
+            "batching": dict(self.server.batcher.stats),
+            "prediction_cache": self.server.batcher.predictor.cache.stats(),
+        })
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            answers = payload["answers"]
+            k = int(payload.get("top_k", TOP_K))
+            explain = bool(payload.get("explain", False))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self._send_json(400, {"error": 'expected a JSON body like {"answers": {...}, "top_k": 3}'})
+            return
+
+        single = isinstance(answers, dict)
+        if single:
+            answers = [answers]
+        if not isinstance(answers, list) or not all(isinstance(a, dict) for a in answers):
+            self._send_json(400, {"error": "answers must be an object or a list of objects"})
+            return
+
+        batcher = self.server.batcher
+        futures = [batcher.submit(a) for a in answers]
+        rows, unseen = [], []
+        for future in futures:
+            try:
+                proba, row_unseen = future.result()
+            except KeyError as e:
+                self._send_json(422, {"error": f"missing answer for feature {e}"})
+                return
+            except (TypeError, ValueError) as e:
+                self._send_json(422, {"error": str(e)})
+                return
+            rows.append(proba)
+            unseen.append(row_unseen)
+
+        # All rankings of the request in one vectorized top-k over the stacked probabilities
+        labels, proba = batcher.predictor.top_k(np.stack(rows), k)
+        results = [
+            format_result(l, p, u) for l, p, u in zip(labels.tolist(), proba.tolist(), unseen)
+        ]
+        if explain:
+            # Answers were validated by the batcher above; a path walk is O(depth)
+            for result, a in zip(results, answers):
+                result["explanation"] = batcher.predictor.explain(a)
+
+        self._send_json(200, results[0] if single else {"predictions": results})
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the cost at hundreds of requests/s
+        pass
+
+# -----------------------------
+# Command line
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve career predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--n-features", type=int, default=model_store.N_FEATURES)
+    parser.add_argument("--backend", choices=model_store.MODEL_BACKENDS, default=model_store.BACKEND)
+    args = parser.parse_args(argv)
+
+    bundle = model_store.get_bundle(n_features=args.n_features, backend=args.backend)
+    batcher = MicroBatcher(bundle["predictor"], max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    server = PooledHTTPServer((args.host, args.port), PredictionHandler, batcher, bundle, workers=args.workers)
+    print(f"Serving predictions on http://{args.host}:{args.port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""Synthetic questionnaire data for scale testing.
+
+    python synth.py synthetic.parquet --rows 10000000 [--chunk-size 100000] [--seed 42]
+
+Learns, from the training data (features_list.pkl columns, workbook as
+fallback), the career frequencies and every column's distribution given
+the career, then samples any number of rows in chunks: a career first,
+then each answer from that career's distribution. Categorical and
+low-cardinality numeric columns are sampled from their (smoothed)
+per-career frequencies, continuous ones from a per-career normal clipped
+to the observed range. The output has the same columns and dtypes as the
+training data, is written as CSV or Parquet (needs pyarrow) and is fully
+determined by --seed and --chunk-size.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_score import ChunkWriter
+from pipeline import DATA_PATH, SNAPSHOT_PATH, FEATURES_PATH, TARGET, load_training_data
+
+CHUNK_SIZE = 100_000
+# Numeric columns with at most this many distinct values are sampled like categories
+MAX_DISCRETE_VALUES = 50
+
+# -----------------------------
+# Fitting
+# -----------------------------
+class ColumnModel:
+    # kind "discrete": values plus one CDF row per career; kind "normal": per-career mean/std
+    __slots__ = ("name", "kind", "values", "cdf", "mean", "std", "low", "high", "decimals", "dtype")
+
+    def __init__(self, name, series, careers, career_codes, smoothing):
+        self.name = name
+        self.dtype = series.dtype
+        numeric = pd.api.types.is_numeric_dtype(series)
+        if numeric and series.nunique() > MAX_DISCRETE_VALUES:
+            self.kind = "normal"
+            values = series.to_numpy(dtype=np.float64)
+            self.low, self.high = values.min(), values.max()
+            self.decimals = _decimals(values)
+            self.mean = np.array([values[career_codes == k].mean() for k in range(len(careers))])
+            self.std = np.array([values[career_codes == k].std() for k in range(len(careers))])
+            # Careers with one row (or none) borrow the column-wide spread
+            fallback = values.std()
+            self.mean = np.where(np.isnan(self.mean), values.mean(), self.mean)
+            self.std = np.where(np.isnan(self.std) | (self.std == 0), fallback, self.std)
+            return
+
+        self.kind = "discrete"
+        codes, self.values = pd.factorize(series, sort=True)
+        counts = np.zeros((len(careers), len(self.values)))
+        np.add.at(counts, (career_codes[codes >= 0], codes[codes >= 0]), 1)
+        # Laplace-style smoothing toward the column marginal: about 20 rows per career
+        # would otherwise rule out every answer a career happened not to give
+        marginal = counts.sum(axis=0) / counts.sum()
+        proba = counts + smoothing * marginal
+        proba /= proba.sum(axis=1, keepdims=True)
+        self.cdf = np.cumsum(proba, axis=1)
+        self.cdf[:, -1] = 1.0
+
+    def sample(self, careers, rng):
+        if self.kind == "normal":
+            values = rng.normal(self.mean[careers], self.std[careers]).clip(self.low, self.high)
+            return pd.Series(values.round(self.decimals)).astype(self.dtype)
+        u = rng.random(len(careers))
+        idx = np.empty(len(careers), dtype=np.intp)
+        # One searchsorted per career over that career's rows
+        order = np.argsort(careers, kind="stable")
+        bounds = np.searchsorted(careers[order], np.arange(len(self.cdf) + 1))
+        for k in range(len(self.cdf)):
+            rows = order[bounds[k]:bounds[k + 1]]
+            if len(rows):
+                idx[rows] = np.searchsorted(self.cdf[k], u[rows], side="right")
+        return pd.Series(np.asarray(self.values)[idx]).astype(self.dtype)
+
+def _decimals(values, max_decimals=6):
+    for d in range(max_decimals + 1):
+        if np.allclose(values, values.round(d)):
+            return d
+    return max_decimals
+
+class SyntheticModel:
+    def __init__(self, df, smoothing=1.0):
+        self.columns = list(df.columns)
+        career_codes, self.careers = pd.factorize(df[TARGET], sort=True)
+        self.career_proba = np.bincount(career_codes, minlength=len(self.careers)) / len(df)
+        self.models = {
+            col: ColumnModel(col, df[col], self.careers, career_codes, smoothing)
+            for col in self.columns if col != TARGET
+        }
+
+    def sample(self, n_rows, rng):
+        careers = rng.choice(len(self.careers), size=n_rows, p=self.career_proba)
+        data = {}
+        for col in self.columns:
+            if col == TARGET:
+                data[col] = np.asarray(self.careers, dtype=object)[careers]
+            else:
+                data[col] = self.models[col].sample(careers, rng).to_numpy()
+        return pd.DataFrame(data, columns=self.columns)
+
+# -----------------------------
+# Generation
+# -----------------------------
+def iter_synthetic(model, n_rows, chunk_size=CHUNK_SIZE, seed=42):
+    # Chunk i draws from its own child of the seed, so the rows depend only on
+    # (seed, chunk_size) and chunks could be produced in parallel
+    n_chunks = -(-n_rows // chunk_size)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        yield model.sample(min(chunk_size, n_rows - i * chunk_size), np.random.default_rng(child))
+
+def synthesize(n_rows, chunk_size=CHUNK_SIZE, seed=42, smoothing=1.0, df=None):
+    # Whole synthetic frame in memory (for benchmarks); use iter_synthetic for big outputs
+    model = SyntheticModel(load_training_data() if df is None else df, smoothing)
+    return pd.concat(iter_synthetic(model, n_rows, chunk_size, seed), ignore_index=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic questionnaire rows.")
+    parser.add_argument("output", help=".csv or .parquet")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--smoothing", type=float, default=1.0,
+                        help="pseudo-count pulling each career's frequencies toward the column marginal")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    parser.add_argument("--features", default=FEATURES_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = SyntheticModel(load_training_data(args.data, args.snapshot, args.features), args.smoothing)
+    writer = ChunkWriter(args.output)
+    n_rows = 0
+    try:
+        for chunk in iter_synthetic(model, args.rows, args.chunk_size, args.seed):
+            writer.write(chunk)
+            n_rows += len(chunk)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {n_rows:,} rows in {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+"""Checks the array-backed models and the submit-path encoder against their references.
+
+    python -m pytest -q
+
+CompiledTree / CompiledForest must score exactly like the scikit-learn estimators
+they were compiled from (including values equal to a split threshold), the
+single-row and batch walks must agree even on NaN, Predictor.encode must match
+encode_frame, and the prediction cache must honour its size and TTL limits.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+import inference
+import model_store
+from compiled_tree import CompiledForest, CompiledTree
+from inference import PredictionCache, Predictor, fit_smoothing
+from pipeline import DATA_PATH, SNAPSHOT_PATH, TARGET, build_schema, load_dataset, load_snapshot
+from questionnaire import QUESTIONS_PATH, load_question_bank
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+@pytest.fixture(scope="module")
+def data():
+    # Coded answers on a half-step grid, so split thresholds (midpoints) are exact float32 values
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 5, size=(600, 6)).astype(np.float32) / 2
+    y = (X[:, 0] + X[:, 1] * 2 + rng.normal(0, 0.5, len(X)) > 3).astype(int) + (X[:, 2] > 1)
+    return X, y
+
+def threshold_rows(thresholds, features, n_cols, rng):
+    # Rows whose value at each split feature equals that split's threshold
+    rows = rng.integers(0, 5, size=(len(thresholds), n_cols)).astype(np.float32) / 2
+    rows[np.arange(len(rows)), features] = thresholds.astype(np.float32)
+    return rows
+
+@pytest.fixture(scope="module")
+def bundle():
+    rng = np.random.default_rng(1)
+    n = 400
+    df = pd.DataFrame({
+        "Interest": rng.choice(["Arts", "Business", "Technology"], n),
+        "Adaptability": rng.choice(["Low", "Medium", "High"], n),
+        "Remote_Work_Experience": rng.choice(["No", "Yes"], n),
+        "GPA": rng.uniform(2, 4, n).round(1),
+        TARGET: rng.choice(["Designer", "Engineer", "Teacher"], n),
+    })
+    return model_store.build_bundle(df, "test", n_features=4)
+
+@pytest.fixture(scope="module")
+def predictor(bundle):
+    return Predictor(bundle, cache=PredictionCache(max_size=0))
+
+# -----------------------------
+# Compiled models vs scikit-learn
+# -----------------------------
+def test_tree_matches_sklearn(data):
+    X, y = data
+    clf = DecisionTreeClassifier(random_state=0).fit(X, y)
+    tree = CompiledTree.from_estimator(clf)
+    internal = clf.tree_.children_left >= 0
+    edge = threshold_rows(clf.tree_.threshold[internal], clf.tree_.feature[internal], X.shape[1],
+                          np.random.default_rng(2))
+    for rows in (X, edge):
+        leaves = tree.apply(rows)
+        np.testing.assert_array_equal(leaves, clf.tree_.apply(rows))
+        np.testing.assert_array_equal([tree.apply_row(row) for row in rows], leaves)
+        np.testing.assert_array_equal([tree.path_row(row)[-1] for row in rows], leaves)
+        np.testing.assert_allclose(tree.predict_proba(rows), clf.predict_proba(rows))
+
+def test_tree_walks_agree_on_nan(data):
+    X, y = data
+    tree = CompiledTree.from_estimator(DecisionTreeClassifier(random_state=0).fit(X, y))
+    rows = X[:100].copy()
+    rows[np.arange(len(rows)), np.arange(len(rows)) % rows.shape[1]] = np.nan
+    np.testing.assert_array_equal([tree.apply_row(row) for row in rows], tree.apply(rows))
+
+@pytest.mark.parametrize("estimator", [
+    RandomForestClassifier(n_estimators=20, random_state=0),
+    ExtraTreesClassifier(n_estimators=20, random_state=0),
+])
+def test_forest_matches_sklearn(data, estimator):
+    X, y = data
+    clf = estimator.fit(X, y)
+    forest = CompiledForest.from_forest(clf)
+    tree = clf.estimators_[0].tree_
+    internal = tree.children_left >= 0
+    edge = threshold_rows(tree.threshold[internal], tree.feature[internal], X.shape[1], np.random.default_rng(3))
+    for rows in (X, edge):
+        np.testing.assert_allclose(forest.predict_proba(rows), clf.predict_proba(rows))
+
+def test_boosting_matches_sklearn(data):
+    X, y = data
+    clf = HistGradientBoostingClassifier(max_iter=20, random_state=0).fit(X, y)
+    forest = CompiledForest.from_boosting(clf)
+    nodes = clf._predictors[0][0].nodes
+    internal = ~nodes["is_leaf"].astype(bool)
+    edge = threshold_rows(nodes["num_threshold"][internal], nodes["feature_idx"][internal], X.shape[1],
+                          np.random.default_rng(4))
+    for rows in (X, edge):
+        np.testing.assert_allclose(forest.predict_proba(rows), clf.predict_proba(rows), atol=1e-12)
+
+def test_forest_blocks_match_single_pass(data):
+    X, y = data
+    forest = CompiledForest.from_forest(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y))
+    whole = forest.predict_proba(X)
+    forest.block_rows = 7
+    np.testing.assert_allclose(forest.predict_proba(X), whole)
+
+# -----------------------------
+# Submit-path encoder
+# -----------------------------
+def test_encode_matches_encode_frame(predictor):
+    df = pd.DataFrame({
+        "Interest": ["Arts", "Technology", "Astrology", None, "1"],
+        "Adaptability": ["Low", 1, "2", "Medium", None],
+        "Remote_Work_Experience": ["Yes", "No", "No", "Maybe", "Yes"],
+        "GPA": [3.1, np.nan, "abc", 2.5, "3.9"],
+    })[predictor.features]
+    X, unseen = predictor.encode_frame(df)
+    rows, row_unseen = [], {}
+    for answers in df.to_dict("records"):
+        row, cols = predictor.encode(answers)
+        rows.append(row.copy())
+        for col, _ in cols:
+            row_unseen[col] = row_unseen.get(col, 0) + 1
+    np.testing.assert_array_equal(np.stack(rows), X)
+    assert unseen == row_unseen
+    assert not np.isnan(X).any()
+
+def test_missing_answers_are_unseen(bundle, predictor):
+    answers = {col: None for col in predictor.features}
+    row, unseen = predictor.encode(answers)
+    assert [col for col, _ in unseen] == predictor.features
+    assert not np.isnan(row).any()
+    with pytest.raises(ValueError):
+        Predictor(bundle, unseen="error").encode(answers)
+
+def test_serving_encodes_missing_like_training(predictor):
+    # Blanks and unknown categories get the schema's one missing code on both sides
+    df = pd.DataFrame({
+        "Interest": ["Arts", None, "Astrology"],
+        "Adaptability": [None, "High", "Low"],
+        "Remote_Work_Experience": ["Yes", None, "No"],
+        "GPA": [3.0, np.nan, 2.5],
+        TARGET: ["Designer", "Engineer", "Teacher"],
+    })
+    trained = predictor.schema.encode(df)[predictor.features].to_numpy(dtype=np.float32)
+    served, _ = predictor.encode_frame(df[predictor.features])
+    np.testing.assert_array_equal(served, trained)
+    assert (served == predictor.schema.missing_code).sum() == 5
+
+def test_single_row_and_batch_predictions_agree(predictor):
+    df = pd.DataFrame({
+        "Interest": ["Arts", None, "Business"],
+        "Adaptability": ["High", "Low", None],
+        "Remote_Work_Experience": [None, "No", "Yes"],
+        "GPA": [np.nan, 3.0, 2.2],
+    })[predictor.features]
+    labels, _, _ = predictor.predict_frame(df)
+    assert [predictor.predict(answers)[0] for answers in df.to_dict("records")] == labels.tolist()
+
+def test_fit_smoothing_follows_held_out_accuracy():
+    # Pure one-row leaves: right on every held-out row needs little smoothing, right on
+    # none of them needs a lot
+    proba = np.eye(4)[[0, 1, 2, 3] * 5]
+    right = np.array([0, 1, 2, 3] * 5)
+    wrong = (right + 1) % 4
+    assert fit_smoothing(proba, 1.0, right) < 0.1
+    assert fit_smoothing(proba, 1.0, wrong) > 1000
+
+# -----------------------------
+# Question bank
+# -----------------------------
+@pytest.mark.parametrize("load", [load_dataset, load_snapshot], ids=["workbook", "snapshot"])
+def test_question_bank_compiles_against_training_schema(load):
+    # Either training source must yield a bank whose every answer has a code
+    path = DATA_PATH if load is load_dataset else SNAPSHOT_PATH
+    if not os.path.exists(path):
+        pytest.skip(f"{path} not available")
+    schema = build_schema(load())
+    bank = load_question_bank(schema, QUESTIONS_PATH)
+    assert bank.features and all(feature in schema for feature in bank.features)
+    for feature in bank.features:
+        spec = schema[feature]
+        for question in bank[feature].questions:
+            if spec.kind == "ordinal":
+                assert set(question.values) <= set(spec.codes.values())
+            elif spec.kind != "numeric":
+                assert set(question.values) <= set(spec.categories)
+
+# -----------------------------
+# Prediction cache
+# -----------------------------
+def test_cache_evicts_least_recently_used():
+    cache = PredictionCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["size"] == 2
+
+def test_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(inference.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(max_size=10, ttl=5)
+    cache.put("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+def test_cache_disabled():
+    cache = PredictionCache(max_size=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None